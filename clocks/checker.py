@@ -0,0 +1,170 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from clocks.trace import decode_timestamp
+from clocks.vector import VectorClock
+from typing import Any, BinaryIO, Hashable, Iterable, Iterator, Optional
+import json
+
+
+# violation kinds
+STALE_READ = 'stale read'
+CAUSAL_INVERSION = 'causal inversion'
+UNWRITTEN_VALUE = 'read of unwritten value'
+
+
+@dataclass
+class Violation:
+    kind: str
+    index: int
+    key: Hashable
+    value: Any
+    ts: tuple
+    write: Optional[tuple] = field(default=None)
+
+
+@dataclass
+class KeyState:
+    """Retained writes to one key in history order, the frontier of
+        maximal writes, and whether any writes have been evicted.
+    """
+    writes: OrderedDict = field(default_factory=OrderedDict)
+    frontier: dict = field(default_factory=dict)
+    evicted: bool = field(default=False)
+
+
+def read_history(file: BinaryIO) -> Iterator[tuple[str, Hashable, Any, tuple]]:
+    """Stream (op, key, value, ts) operations from a JSON lines history.
+        Each line is a trace record with added op ('r' or 'w'), key and
+        value fields.
+    """
+    uuids = {}
+    for line in file:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        value = record['value']
+        yield (
+            record['op'],
+            record['key'],
+            tuple(value) if type(value) is list else value,
+            decode_timestamp(record, uuids)
+        )
+
+
+@dataclass
+class CausalChecker:
+    """Checks a history of reads and writes for causal consistency in a
+        single pass. The history must be in an order consistent with
+        happens-before, e.g. the order it was recorded in, and written
+        values must be unique per key; a read of None reads the initial
+        value. Per key, at most window recent writes and window
+        frontier writes are kept. Across keys, at most budget writes
+        are retained; once over budget, the least recently used keys
+        are dropped entirely. Memory is thus bounded by budget
+        regardless of history length. Reads that depend on dropped
+        state cannot be verified and are counted in unverified instead
+        of being reported.
+    """
+    clock_type: type = field(default=VectorClock)
+    window: int = field(default=1024)
+    budget: int = field(default=1_000_000)
+    keys: OrderedDict = field(default_factory=OrderedDict)
+    retained: int = field(default=0)
+    keys_evicted: bool = field(default=False)
+    operations: int = field(default=0)
+    unverified: int = field(default=0)
+
+    def _before_or_same(self, ts1: tuple, ts2: tuple) -> bool:
+        return ts1 == ts2 or self.clock_type.happens_before(ts1, ts2)
+
+    def write(self, key: Hashable, value: Any, ts: tuple) -> None:
+        """Record a write and advance the key's frontier."""
+        state = self.keys.get(key)
+        if state is None:
+            # once keys have been dropped, this one may have earlier writes
+            state = self.keys[key] = KeyState(evicted=self.keys_evicted)
+        else:
+            self.keys.move_to_end(key)
+        size = len(state.writes) + len(state.frontier)
+
+        state.writes[value] = ts
+        state.writes.move_to_end(value)
+        if len(state.writes) > self.window:
+            state.writes.popitem(last=False)
+            state.evicted = True
+
+        happens_before = self.clock_type.happens_before
+        for old in [v for v, w in state.frontier.items() if happens_before(w, ts)]:
+            del state.frontier[old]
+        if not any(happens_before(ts, w) for w in state.frontier.values()):
+            state.frontier[value] = ts
+        if len(state.frontier) > self.window:
+            del state.frontier[next(iter(state.frontier))]
+            state.evicted = True
+
+        self.retained += len(state.writes) + len(state.frontier) - size
+        while self.retained > self.budget and len(self.keys) > 1:
+            _, old = self.keys.popitem(last=False)
+            self.retained -= len(old.writes) + len(old.frontier)
+            self.keys_evicted = True
+
+    def read(self, key: Hashable, value: Any, ts: tuple, index: int = 0) -> Optional[Violation]:
+        """Check a read against the writes to its key."""
+        state = self.keys.get(key)
+        if state is not None:
+            self.keys.move_to_end(key)
+        elif self.keys_evicted:
+            self.unverified += 1
+            return None
+        else:
+            state = KeyState()
+
+        if value is None:
+            for write in (*state.writes.values(), *state.frontier.values()):
+                if self._before_or_same(write, ts):
+                    return Violation(STALE_READ, index, key, value, ts, write)
+            if state.evicted:
+                self.unverified += 1
+            return None
+
+        if value in state.frontier:
+            write = state.frontier[value]
+        elif value in state.writes:
+            write = state.writes[value]
+        elif state.evicted:
+            self.unverified += 1
+            return None
+        else:
+            return Violation(UNWRITTEN_VALUE, index, key, value, ts)
+
+        if self.clock_type.happens_before(ts, write):
+            return Violation(CAUSAL_INVERSION, index, key, value, ts, write)
+
+        # frontier writes have no successors, so reading them cannot be stale
+        if value in state.frontier:
+            return None
+
+        happens_before = self.clock_type.happens_before
+        for later_value, later in reversed(state.writes.items()):
+            if later_value == value:
+                break
+            if happens_before(write, later) and self._before_or_same(later, ts):
+                return Violation(STALE_READ, index, key, value, ts, later)
+
+        return None
+
+    def check(self, history: Iterable[tuple[str, Hashable, Any, tuple]]) -> Iterator[Violation]:
+        """Stream the history and yield each violation found."""
+        for op, key, value, ts in history:
+            assert op in ('r', 'w'), f'unknown op {op!r} at index {self.operations}'
+            index = self.operations
+            self.operations += 1
+
+            if op == 'w':
+                self.write(key, value, ts)
+                continue
+
+            violation = self.read(key, value, ts, index)
+            if violation is not None:
+                yield violation
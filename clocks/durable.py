@@ -0,0 +1,180 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from clocks.scalar import ScalarClock
+from clocks.vector import VectorClock
+from typing import Any
+import mmap
+import os
+import struct
+import zlib
+
+
+# file layout: header, then two alternating slots of sequence, crc, packed clock
+MAGIC = b'CLKS'
+HEADER_FORMAT = '!4sI'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+SLOT_FORMAT = '!QI'
+SLOT_SIZE = struct.calcsize(SLOT_FORMAT)
+
+
+def _get_counter(clock: ScalarClock|VectorClock) -> int:
+    """Return the component of the clock advanced by this node."""
+    if isinstance(clock, VectorClock):
+        return clock.vector[clock.index]
+    return clock.scalar
+
+def _set_counter(clock: ScalarClock|VectorClock, value: int) -> None:
+    """Set the component of the clock advanced by this node."""
+    if isinstance(clock, VectorClock):
+        vector = [*clock.vector]
+        vector[clock.index] = value
+        clock.vector = (*vector,)
+    else:
+        clock.scalar = value
+
+
+@dataclass
+class DurableClock:
+    """Wraps a ScalarClock or VectorClock with a memory-mapped state
+        file. Instead of syncing every update, a high-water mark is
+        reserved window ticks ahead of the in-memory counter and the
+        file is only rewritten and flushed when the counter crosses it.
+        On restart the clock resumes from the reserved mark, so it never
+        repeats a value. Other VectorClock components are restored as
+        of the last reservation.
+    """
+    clock: ScalarClock|VectorClock
+    path: str
+    window: int = field(default=1000)
+    reserved: int = field(default=0)
+    sequence: int = field(default=0)
+    file: Any = field(default=None)
+    mm: mmap.mmap = field(default=None)
+
+    @classmethod
+    def open(cls, path: str, clock: ScalarClock|VectorClock, window: int = 1000) -> DurableClock:
+        """Open the state file at path, restoring the clock from it if
+            it has valid state and otherwise starting from clock.
+        """
+        assert isinstance(clock, (ScalarClock, VectorClock)), \
+            'clock must be ScalarClock or VectorClock'
+        assert type(window) is int and window > 0, 'window must be int > 0'
+
+        size = len(clock.pack())
+        file_size = HEADER_SIZE + 2 * (SLOT_SIZE + size)
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+
+        file = open(path, 'r+b' if exists else 'w+b')
+        if not exists:
+            file.write(struct.pack(HEADER_FORMAT, MAGIC, size))
+            file.write(b'\x00' * (file_size - HEADER_SIZE))
+            file.flush()
+            os.fsync(file.fileno())
+
+        try:
+            file.seek(0)
+            header = file.read(HEADER_SIZE)
+            assert len(header) == HEADER_SIZE, 'state file is truncated'
+            magic, stored_size = struct.unpack(HEADER_FORMAT, header)
+            assert magic == MAGIC, 'state file has invalid magic'
+            assert stored_size == size, 'state file does not match clock size'
+            assert os.fstat(file.fileno()).st_size >= file_size, \
+                'state file is truncated'
+        except BaseException:
+            file.close()
+            raise
+
+        mm = mmap.mmap(file.fileno(), file_size)
+
+        durable = cls(clock, path, window, 0, 0, file, mm)
+        durable._restore()
+        durable.reserve(_get_counter(durable.clock) + window)
+
+        return durable
+
+    def _slot_offset(self, sequence: int) -> int:
+        return HEADER_SIZE + (sequence % 2) * (SLOT_SIZE + len(self.clock.pack()))
+
+    def _restore(self) -> None:
+        """Load the newest valid slot from the state file, if any."""
+        size = len(self.clock.pack())
+        best = None
+
+        for slot in (0, 1):
+            offset = self._slot_offset(slot)
+            sequence, crc = struct.unpack(SLOT_FORMAT, self.mm[offset:offset+SLOT_SIZE])
+            packed = self.mm[offset+SLOT_SIZE:offset+SLOT_SIZE+size]
+            if sequence == 0 or zlib.crc32(struct.pack('!Q', sequence) + packed) != crc:
+                continue
+            if best is None or sequence > best[0]:
+                best = (sequence, packed)
+
+        if best is not None:
+            self.sequence, packed = best
+            self.clock = type(self.clock).unpack(packed)
+            self.reserved = _get_counter(self.clock)
+
+    def reserve(self, value: int) -> None:
+        """Durably record value as the high-water mark for the counter."""
+        assert type(value) is int, 'value must be int'
+        assert value < 2**32, 'value must fit in 32 bits'
+
+        current = _get_counter(self.clock)
+        _set_counter(self.clock, value)
+        packed = self.clock.pack()
+        _set_counter(self.clock, current)
+
+        sequence = self.sequence + 1
+        offset = self._slot_offset(sequence)
+        self.mm[offset:offset+SLOT_SIZE+len(packed)] = struct.pack(
+            SLOT_FORMAT,
+            sequence,
+            zlib.crc32(struct.pack('!Q', sequence) + packed)
+        ) + packed
+        self.mm.flush()
+
+        self.sequence = sequence
+        self.reserved = value
+
+    def advance(self, data: tuple = None) -> tuple:
+        """Create an update that advances the clock to the given time."""
+        return self.clock.advance(data)
+
+    def read(self) -> tuple:
+        """Read the current state of the clock."""
+        return self.clock.read()
+
+    def update(self, state: tuple = None) -> DurableClock:
+        """Update the clock, reserving a new high-water mark before the
+            update is kept if the counter crossed the current one. If
+            the reservation fails, the update is rolled back so that
+            the clock never runs ahead of its durable mark.
+        """
+        name = 'vector' if isinstance(self.clock, VectorClock) else 'scalar'
+        previous = getattr(self.clock, name)
+        self.clock.update(state)
+
+        counter = _get_counter(self.clock)
+        if counter >= self.reserved:
+            try:
+                self.reserve(counter + self.window)
+            except BaseException:
+                setattr(self.clock, name, previous)
+                raise
+
+        return self
+
+    def close(self) -> None:
+        """Close the memory map and state file."""
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self) -> DurableClock:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -1,2 +1,265 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from heapq import heappop, heappush
+from statistics import median_low
+from time import time, time_ns
+from typing import Any
+import asyncio
+import struct
+from uuid import uuid1
+
+
+@dataclass
+class CommitWaiter:
+    """Coalesces commit waits onto a single event loop timer. Waits are
+        kept in a heap by deadline and the timer is only rescheduled
+        when an earlier deadline arrives, so thousands of pending
+        commits cost one timer and are released together. Waits are
+        bound to one running event loop at a time.
+    """
+    heap: list = field(default_factory=list)
+    timer: Any = field(default=None)
+    loop: Any = field(default=None)
+    counter: int = field(default=0)
+
+    def wait_until(self, deadline: float) -> asyncio.Future:
+        """Return a future resolved once time() reaches the deadline."""
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            assert self.loop is None or self.loop.is_closed() or \
+                all(future.done() for _, _, future in self.heap), \
+                'commit waits are still pending on another event loop'
+            self.heap, self.timer, self.loop = [], None, loop
+
+        future = loop.create_future()
+        if deadline <= time():
+            future.set_result(None)
+            return future
+
+        self.counter += 1
+        heappush(self.heap, (deadline, self.counter, future))
+        if self.heap[0][2] is future:
+            self._schedule()
+
+        return future
+
+    def _schedule(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = self.loop.call_later(
+            max(self.heap[0][0] - time(), 0),
+            self._release
+        )
+
+    def _release(self) -> None:
+        self.timer = None
+        now = time()
+        while self.heap and self.heap[0][0] <= now:
+            _, _, future = heappop(self.heap)
+            if not future.done():
+                future.set_result(None)
+
+        if self.heap:
+            self._schedule()
+
+
+@dataclass
 class HybridClock:
-    ...
+    uuid: bytes = field(default_factory=lambda: uuid1().bytes)
+    ts: int = field(default=0)
+    scalar: int = field(default=0)
+    offset: int = field(default=0)
+    error: int = field(default=0)
+    max_drift: int = field(default=15)
+    synced: int = field(default_factory=lambda: time_ns() // 1000, compare=False)
+    waiter: CommitWaiter = field(default_factory=CommitWaiter, repr=False, compare=False)
+
+    @classmethod
+    def setup(cls, options: dict = {}) -> HybridClock:
+        """Set up a new instance."""
+        assert type(options) is dict, 'options must be dict'
+
+        uuid = options['uuid'] if 'uuid' in options else uuid1().bytes
+        ts = options['ts'] if 'ts' in options else 0
+        scalar = options['scalar'] if 'scalar' in options else 0
+        offset = options['offset'] if 'offset' in options else 0
+        error = options['error'] if 'error' in options else 0
+        max_drift = options['max_drift'] if 'max_drift' in options else 15
+
+        return cls(uuid, ts, scalar, offset, error, max_drift)
+
+    def now(self) -> int:
+        """Return the physical time in microseconds since the Unix epoch,
+            corrected by the synchronized offset.
+        """
+        return time_ns() // 1000 + self.offset
+
+    def error_bound(self) -> int:
+        """Return the current error bound in microseconds: the error
+            estimated at the last synchronization plus the worst-case
+            drift since then at max_drift parts per million.
+        """
+        elapsed = time_ns() // 1000 - self.synced
+        return self.error + max(elapsed, 0) * self.max_drift // 1_000_000
+
+    def read_interval(self) -> tuple[int, int]:
+        """Return the (earliest, latest) physical time the reference
+            clock could currently read, given the error bound.
+        """
+        pt = self.now()
+        error = self.error_bound()
+        return (pt - error, pt + error)
+
+    async def commit_wait(self, ts: tuple[bytes, int, int]) -> None:
+        """Wait until the earliest possible physical time is past the
+            physical component of ts, so that ts is in the past on
+            every clock in the cluster.
+        """
+        assert type(ts) is tuple and len(ts) == 3, \
+            'ts must be tuple[bytes, int, int]'
+        assert type(ts[1]) is int, 'ts must be tuple[bytes, int, int]'
+
+        # without drift, now() - error > ts[1] once the local time
+        # reaches base; drift grows the bound by max_drift per million
+        # microseconds elapsed since synced, so scale the remaining wait
+        base = ts[1] - self.offset + self.error + 1
+        remaining = max(base - self.synced, 0) * 1_000_000
+        deadline = self.synced - (-remaining // (1_000_000 - self.max_drift))
+        await self.waiter.wait_until(deadline / 1_000_000)
+
+    def advance(self, data: tuple = None) -> tuple[bytes, int, int]:
+        """Create an update that advances the clock to the given time."""
+        if data is not None:
+            assert type(data) is tuple, 'data must be tuple[int] or None'
+            assert type(data[0]) is int, 'data must be tuple[int]'
+
+        pt = self.now()
+        if pt > self.ts:
+            return (self.uuid, pt, 0)
+
+        return (self.uuid, self.ts, self.scalar + (data[0] if data else 1))
+
+    def read(self) -> tuple[bytes, int, int]:
+        """Read the current state of the clock."""
+        return (self.uuid, self.ts, self.scalar)
+
+    def update(self, state: tuple = None) -> HybridClock:
+        """Update the clock if the state verifies."""
+        if state is None:
+            return self
+
+        assert type(state) is tuple, 'state must be tuple[bytes, int, int]'
+        assert len(state) == 3, 'state must have len 3'
+        assert type(state[0]) is bytes, 'state must be tuple[bytes, int, int]'
+        assert type(state[1]) is int, 'state must be tuple[bytes, int, int]'
+        assert type(state[2]) is int, 'state must be tuple[bytes, int, int]'
+
+        if state[0] != self.uuid:
+            return self
+
+        pt = self.now()
+        ts = max(self.ts, state[1], pt)
+
+        if ts == self.ts == state[1]:
+            self.scalar = max(self.scalar, state[2]) + 1
+        elif ts == self.ts:
+            self.scalar += 1
+        elif ts == state[1]:
+            self.scalar = state[2] + 1
+        else:
+            self.scalar = 0
+
+        self.ts = ts
+
+        return self
+
+    @staticmethod
+    def are_incomparable(ts1: tuple[bytes, int, int], ts2: tuple[bytes, int, int]) -> bool:
+        """Determine if ts1 and ts2 are incomparable."""
+        assert type(ts1) is type(ts2) is tuple, \
+            'timestamps must be tuples of form (bytes uuid, int time, int scalar)'
+        assert len(ts1) == len(ts2) == 3, \
+            'timestamps must be tuples of form (bytes uuid, int time, int scalar)'
+
+        return ts1[0] != ts2[0]
+
+    @staticmethod
+    def happens_before(ts1: tuple[bytes, int, int], ts2: tuple[bytes, int, int]) -> bool:
+        """Determine if ts1 happens before ts2."""
+        if HybridClock.are_incomparable(ts1, ts2):
+            return False
+
+        return (ts1[1], ts1[2]) < (ts2[1], ts2[2])
+
+    @staticmethod
+    def are_concurrent(ts1: tuple[bytes, int, int], ts2: tuple[bytes, int, int]) -> bool:
+        """Determine if ts1 and ts2 are concurrent."""
+        if HybridClock.are_incomparable(ts1, ts2):
+            return False
+
+        return (ts1[1], ts1[2]) == (ts2[1], ts2[2])
+
+    @staticmethod
+    def calculate_offset(timestamps: list[tuple[int, int, int, int]]) -> tuple[int, int]:
+        """Calculate the offset with a neighbor in the cluster. Input
+            format is a tuple or list of observations; each observation
+            is of form (local_ts_sent, foreign_ts_received,
+            foreign_ts_sent, local_ts_received), each ts in microseconds.
+            Returns (offset, error) from the observation with the lowest
+            round-trip delay, where error is half that delay.
+        """
+        assert type(timestamps) in (list, tuple), \
+            'timestamps must be list or tuple of observations'
+        assert len(timestamps) > 0, 'at least one observation is required'
+
+        best = None
+        for observation in timestamps:
+            assert len(observation) == 4, 'each observation must have len 4'
+            t1, t2, t3, t4 = observation
+            delay = (t4 - t1) - (t3 - t2)
+            offset = ((t2 - t1) + (t3 - t4)) // 2
+            if best is None or delay < best[0]:
+                best = (delay, offset)
+
+        return (best[1], max(best[0], 0) // 2)
+
+    def synchronize(self, time_offsets: tuple[int], errors: tuple[int] = ()) -> HybridClock:
+        """Synchronize to the median clock of the cluster. If the error
+            of each offset is given, the error bound becomes the error
+            of the chosen offset plus the median deviation of the
+            offsets from it, and drift is counted from now on.
+        """
+        assert type(time_offsets) in (list, tuple), \
+            'time_offsets must be tuple[int]'
+        assert type(errors) in (list, tuple), 'errors must be tuple[int]'
+        assert len(errors) in (0, len(time_offsets)), \
+            'errors must have one entry per offset'
+
+        if len(time_offsets) == 0:
+            return self
+
+        offsets = (0, *time_offsets)
+        median = median_low(offsets)
+        self.offset += median
+
+        if errors:
+            error = (0, *errors)[offsets.index(median)]
+            spread = median_low([abs(o - median) for o in offsets])
+            self.error = error + spread
+            self.synced = time_ns() // 1000
+
+        return self
+
+    def pack(self) -> bytes:
+        """Pack the clock down to bytes."""
+        return struct.pack('!16sQI', self.uuid, self.ts, self.scalar)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> HybridClock:
+        """Unpack a clock from bytes."""
+        assert type(data) is bytes, 'data must be bytes of len 28'
+        assert len(data) == 28, 'data must be bytes of len 28'
+
+        uuid, ts, scalar = struct.unpack('!16sQI', data)
+
+        return cls(uuid, ts, scalar)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Any, Protocol, runtime_checkable
+from typing import Any, Callable, Protocol, runtime_checkable
 
 
 @runtime_checkable
@@ -87,15 +87,36 @@ class ChainClockProtocol(Protocol):
 @runtime_checkable
 class HybridTimeProtocol(Protocol):
     """Duck typed Protocol showing what a HybridTime clock must do."""
-    def calculate_offset(timestamps: list[tuple[int, int, int, int]]) -> tuple[int]:
+    def now(self) -> int:
+        """Return the physical time corrected by the synchronized offset."""
+        ...
+
+    def calculate_offset(timestamps: list[tuple[int, int, int, int]]) -> tuple[int, int]:
         """Calculate the offset with a neighbor in the cluster. Input
             format is a tuple or list of observations; each observation
             is of form (local_ts_sent, foreign_ts_received,
-            foreign_ts_sent, local_ts_received), each ts in seconds
+            foreign_ts_sent, local_ts_received), each ts in microseconds
             since Unix epoch as calculated by physical system clocks.
+            Returns (offset, error).
         """
         ...
 
-    def synchronize(time_offsets: tuple[int]) -> HybridTimeProtocol:
+    def synchronize(time_offsets: tuple[int], errors: tuple[int] = ()) -> HybridTimeProtocol:
         """Synchronize to the median clock of the cluster."""
         ...
+
+
+@runtime_checkable
+class TransportProtocol(Protocol):
+    """Duck typed Protocol showing what a packet transport must do."""
+    def send(self, data: bytes, peer: Any) -> None:
+        """Send the data to the peer without waiting for delivery."""
+        ...
+
+    def listen(self, handler: Callable[[bytes, Any], None]) -> None:
+        """Register a handler called with (data, peer) for each packet."""
+        ...
+
+    def close(self) -> None:
+        """Stop sending and receiving packets."""
+        ...
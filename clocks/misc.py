@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from typing import Any, Optional
+import hmac
 
 
 # helper functions
@@ -13,7 +14,7 @@ def xor(b1: bytes, b2: bytes) -> bytes:
 
 def bytes_are_same(b1: bytes, b2: bytes) -> bool:
     """Timing-attack safe bytes comparison."""
-    return len(b1) == len(b2) and int.from_bytes(xor(b1, b2), 'little') == 0
+    return len(b1) == len(b2) and hmac.compare_digest(b1, b2)
 
 def all_ascii(data: bytes) -> bool:
     """Determine if all bytes are displayable ascii chars."""
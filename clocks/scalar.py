@@ -1,12 +1,11 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 import struct
-from clocks.misc import bytes_are_same
 from typing import Any
 from uuid import uuid1
 
 
-@dataclass
+@dataclass(slots=True)
 class ScalarClock:
     uuid: bytes = field(default_factory=lambda: uuid1().bytes)
     scalar: int = field(default=0)
@@ -21,6 +20,17 @@ class ScalarClock:
 
         return cls(uuid, scalar)
 
+    @classmethod
+    def setup_many(cls, count: int, options: dict = {}) -> list[ScalarClock]:
+        """Set up count new instances sharing one uuid."""
+        assert type(count) is int and count >= 0, 'count must be int >= 0'
+        assert type(options) is dict, 'options must be dict'
+
+        uuid = options['uuid'] if 'uuid' in options else uuid1().bytes
+        scalar = options['scalar'] if 'scalar' in options else 0
+
+        return [cls(uuid, scalar) for _ in range(count)]
+
     def advance(self, data: tuple = None) -> tuple[bytes, int]:
         """Create an update that advances the clock to the given time."""
         if data is not None:
@@ -41,7 +51,7 @@ class ScalarClock:
         assert type(state[0]) is bytes, 'state must be tuple[bytes, int]'
         assert type(state[1]) is int, 'state must be tuple[bytes, int]'
 
-        if not bytes_are_same(state[0], self.uuid):
+        if state[0] != self.uuid:
             return self
 
         self.scalar = max(self.scalar, state[1]) + 1
@@ -56,7 +66,7 @@ class ScalarClock:
         assert len(ts1) == len(ts2) == 2, \
             'timestamps must be tuples of form (bytes uuid, int time'
 
-        return not bytes_are_same(ts1[0], ts2[0])
+        return ts1[0] != ts2[0]
 
 
     @staticmethod
@@ -85,4 +95,6 @@ class ScalarClock:
         assert type(data) is bytes, 'data must be bytes of len 20'
         assert len(data) == 20, 'data must be bytes of len 20'
 
-        return cls(*struct.unpack('!16sI', data))
+        uuid, scalar = struct.unpack('!16sI', data)
+
+        return cls(uuid, scalar)
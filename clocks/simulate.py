@@ -0,0 +1,210 @@
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass, field
+from clocks.interfaces import ClockProtocol
+from random import Random
+from time import perf_counter, perf_counter_ns
+from typing import Callable, Optional
+from uuid import uuid1
+import heapq
+import operator
+
+
+# event kinds
+SEND = 0
+DELIVER = 1
+RESTART = 2
+
+
+# counters reported per run
+COUNTERS = ('sent', 'received', 'dropped', 'restarts', 'bytes_sent', 'merge_ns')
+
+
+# topologies: choose a destination for a message sent by src
+def ring(src: int, nodes: int, rng: Random) -> int:
+    """Send to the next node in the ring."""
+    return (src + 1) % nodes
+
+def uniform_random(src: int, nodes: int, rng: Random) -> int:
+    """Send to any other node with equal probability."""
+    dst = rng.randrange(nodes - 1)
+    return dst + 1 if dst >= src else dst
+
+def star(src: int, nodes: int, rng: Random) -> int:
+    """Leaves send to node 0; node 0 sends to a random leaf."""
+    return rng.randrange(1, nodes) if src == 0 else 0
+
+
+# distributions: return a delay in simulated seconds
+def constant(delay: float) -> Callable[[Random], float]:
+    """Always the same delay; preserves message order on each link."""
+    return lambda rng: delay
+
+def uniform(low: float, high: float) -> Callable[[Random], float]:
+    """Uniformly distributed delay; reorders messages."""
+    return lambda rng: rng.uniform(low, high)
+
+def exponential(mean: float) -> Callable[[Random], float]:
+    """Exponentially distributed delay; reorders messages."""
+    return lambda rng: rng.expovariate(1 / mean)
+
+
+@dataclass
+class Report:
+    """Per-node results of one simulation run, stored in flat arrays
+        that are independent of the simulation's running totals.
+    """
+    nodes: int
+    duration: float
+    wall_time: float
+    events: int
+    sent: array
+    received: array
+    dropped: array
+    restarts: array
+    bytes_sent: array
+    merge_ns: array
+
+    def throughput(self, node: int) -> float:
+        """Messages merged per simulated second by the node."""
+        return self.received[node] / self.duration if self.duration else 0.0
+
+    def summary(self) -> dict:
+        """Aggregate the per-node results."""
+        received = sum(self.received)
+        return {
+            'nodes': self.nodes,
+            'duration': self.duration,
+            'events': self.events,
+            'events_per_second': self.events / self.wall_time if self.wall_time else 0.0,
+            'sent': sum(self.sent),
+            'received': received,
+            'dropped': sum(self.dropped),
+            'restarts': sum(self.restarts),
+            'bytes_sent': sum(self.bytes_sent),
+            'bytes_per_message': sum(self.bytes_sent) / max(sum(self.sent), 1),
+            'mean_merge_ns': sum(self.merge_ns) / max(received, 1),
+        }
+
+
+@dataclass
+class Simulation:
+    """Discrete-event simulation of a cluster of nodes exchanging packed
+        clocks. Each node holds one unmodified ClockProtocol instance;
+        all other per-node state lives in flat arrays so that clusters
+        of 100k+ nodes fit in memory.
+    """
+    clock_type: type
+    nodes: int
+    topology: Callable[[int, int, Random], int] = field(default=uniform_random)
+    latency: Callable[[Random], float] = field(default=exponential(0.01))
+    send_interval: Callable[[Random], float] = field(default=exponential(1.0))
+    churn: float = field(default=0.0)
+    downtime: Callable[[Random], float] = field(default=constant(1.0))
+    options: Optional[Callable[[int], dict]] = field(default=None)
+    seed: Optional[int] = field(default=None)
+
+    def __post_init__(self) -> None:
+        assert isinstance(self.clock_type, type) and \
+            issubclass(self.clock_type, ClockProtocol), \
+            'clock_type must implement ClockProtocol'
+        assert type(self.nodes) is int and self.nodes > 1, 'nodes must be int > 1'
+        assert 0.0 <= self.churn <= 1.0, 'churn must be between 0 and 1'
+
+        self.rng = Random(self.seed)
+        self.uuid = uuid1().bytes
+        self.clocks = [self._new_clock(i) for i in range(self.nodes)]
+        self.up = bytearray(b'\x01') * self.nodes
+        self.sent = array('Q', bytes(8 * self.nodes))
+        self.received = array('Q', bytes(8 * self.nodes))
+        self.dropped = array('Q', bytes(8 * self.nodes))
+        self.restarts = array('Q', bytes(8 * self.nodes))
+        self.bytes_sent = array('Q', bytes(8 * self.nodes))
+        self.merge_ns = array('Q', bytes(8 * self.nodes))
+        self.now = 0.0
+        self.events = []
+        self.counter = 0
+
+        for node in range(self.nodes):
+            self._schedule(self.send_interval(self.rng), SEND, node, None)
+
+    def _new_clock(self, node: int) -> ClockProtocol:
+        options = {'uuid': self.uuid}
+        if self.options is not None:
+            options.update(self.options(node))
+        return self.clock_type.setup(options)
+
+    def _schedule(self, delay: float, kind: int, node: int, data: Optional[bytes]) -> None:
+        self.counter += 1
+        heapq.heappush(self.events, (self.now + delay, self.counter, kind, node, data))
+
+    def run(self, duration: float = None, events: int = None) -> Report:
+        """Process events until the simulated duration elapses or the
+            event budget is spent, whichever comes first.
+        """
+        assert duration is not None or events is not None, \
+            'duration or events must be specified'
+
+        end = self.now + duration if duration is not None else float('inf')
+        budget = events if events is not None else -1
+        processed = 0
+        start = perf_counter()
+        started_at = self.now
+        before = {name: array('Q', getattr(self, name)) for name in COUNTERS}
+
+        clocks, rng = self.clocks, self.rng
+        unpack = self.clock_type.unpack
+
+        while self.events and processed != budget and self.events[0][0] <= end:
+            self.now, _, kind, node, data = heapq.heappop(self.events)
+            processed += 1
+
+            if kind == SEND:
+                if not self.up[node]:
+                    continue
+
+                if self.churn and rng.random() < self.churn:
+                    self.up[node] = 0
+                    self._schedule(self.downtime(rng), RESTART, node, None)
+                    continue
+
+                clock = clocks[node]
+                clock.update(clock.read())
+                packed = clock.pack()
+                self.sent[node] += 1
+                self.bytes_sent[node] += len(packed)
+                dst = self.topology(node, self.nodes, rng)
+                self._schedule(self.latency(rng), DELIVER, dst, packed)
+                self._schedule(self.send_interval(rng), SEND, node, None)
+
+            elif kind == DELIVER:
+                if not self.up[node]:
+                    self.dropped[node] += 1
+                    continue
+
+                # merge_ns times only the merge, not the decode
+                state = unpack(data).read()
+                begin = perf_counter_ns()
+                clocks[node].update(state)
+                self.merge_ns[node] += perf_counter_ns() - begin
+                self.received[node] += 1
+
+            elif kind == RESTART:
+                self.up[node] = 1
+                clocks[node] = self._new_clock(node)
+                self.restarts[node] += 1
+                self._schedule(self.send_interval(rng), SEND, node, None)
+
+        if duration is not None and processed != budget:
+            self.now = end
+
+        return Report(
+            nodes=self.nodes,
+            duration=self.now - started_at,
+            wall_time=perf_counter() - start,
+            events=processed,
+            **{
+                name: array('Q', map(operator.sub, getattr(self, name), before[name]))
+                for name in COUNTERS
+            }
+        )
@@ -0,0 +1,261 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from clocks.interfaces import ClockProtocol, HybridTimeProtocol, TransportProtocol
+from clocks.misc import BoundedQueue
+from typing import Any, Callable, Hashable, Iterable
+import asyncio
+import struct
+
+
+# packet formats: kind, nonce, then the timestamps known to the sender
+REQUEST = 0
+RESPONSE = 1
+REQUEST_FORMAT = '!BIq'
+RESPONSE_FORMAT = '!BIqq'
+REQUEST_SIZE = struct.calcsize(REQUEST_FORMAT)
+RESPONSE_SIZE = struct.calcsize(RESPONSE_FORMAT)
+
+# envelope header: sent, sync generation, echoed foreign sent, echoed local
+# received, echoed foreign generation, clock len
+ENVELOPE_FORMAT = '!qHqqHI'
+ENVELOPE_SIZE = struct.calcsize(ENVELOPE_FORMAT)
+
+
+def calculate_offsets(clock: HybridTimeProtocol,
+                      observations: dict[Hashable, list[tuple[int, int, int, int]]]
+                      ) -> tuple[tuple[int], tuple[int]]:
+    """Calculate the offset and error for every peer that has
+        observations, suitable for passing to clock.synchronize.
+    """
+    assert type(observations) is dict, 'observations must be dict'
+
+    offsets, errors = [], []
+    for peer_observations in observations.values():
+        if len(peer_observations) > 0:
+            offset, error = clock.calculate_offset(peer_observations)
+            offsets.append(offset)
+            errors.append(error)
+
+    return (tuple(offsets), tuple(errors))
+
+
+@dataclass
+class UDPTransport(asyncio.DatagramProtocol):
+    """Asyncio UDP implementation of TransportProtocol."""
+    handlers: list = field(default_factory=list)
+    endpoint: Any = field(default=None)
+
+    @classmethod
+    async def open(cls, local_addr: tuple[str, int] = ('127.0.0.1', 0)) -> UDPTransport:
+        """Bind a new UDP socket on the running event loop."""
+        transport = cls()
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(lambda: transport, local_addr=local_addr)
+        return transport
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """The local address peers should send to."""
+        return self.endpoint.get_extra_info('sockname')
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.endpoint = transport
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        for handler in self.handlers:
+            handler(data, addr)
+
+    def send(self, data: bytes, peer: tuple[str, int]) -> None:
+        """Send the data to the peer without waiting for delivery."""
+        if self.endpoint is not None and not self.endpoint.is_closing():
+            self.endpoint.sendto(data, peer)
+
+    def listen(self, handler: Callable[[bytes, Any], None]) -> None:
+        """Register a handler called with (data, peer) for each packet."""
+        self.handlers.append(handler)
+
+    def close(self) -> None:
+        """Stop sending and receiving packets."""
+        if self.endpoint is not None:
+            self.endpoint.close()
+
+
+@dataclass
+class SyncDriver:
+    """Exchanges timing packets with peers over a transport and feeds
+        the resulting observations into clock.synchronize. Requests to
+        all peers are sent before any response is awaited, so a round
+        takes one round trip regardless of the number of peers.
+    """
+    clock: HybridTimeProtocol
+    transport: TransportProtocol
+    samples: int = field(default=1)
+    timeout: float = field(default=1.0)
+    pending: dict = field(default_factory=dict)
+    nonce: int = field(default=0)
+
+    def __post_init__(self) -> None:
+        assert isinstance(self.clock, HybridTimeProtocol), \
+            'clock must implement HybridTimeProtocol'
+        assert isinstance(self.transport, TransportProtocol), \
+            'transport must implement TransportProtocol'
+        assert type(self.samples) is int and self.samples > 0, \
+            'samples must be int > 0'
+        self.transport.listen(self.receive)
+
+    def _next_nonce(self) -> int:
+        self.nonce = (self.nonce + 1) % 2**32
+        return self.nonce
+
+    def receive(self, data: bytes, peer: Any) -> None:
+        """Answer timing requests and resolve pending exchanges."""
+        if len(data) == REQUEST_SIZE and data[0] == REQUEST:
+            received = self.clock.now()
+            _, nonce, _ = struct.unpack(REQUEST_FORMAT, data)
+            self.transport.send(
+                struct.pack(RESPONSE_FORMAT, RESPONSE, nonce, received, self.clock.now()),
+                peer
+            )
+        elif len(data) == RESPONSE_SIZE and data[0] == RESPONSE:
+            local_received = self.clock.now()
+            _, nonce, foreign_received, foreign_sent = struct.unpack(RESPONSE_FORMAT, data)
+            if nonce not in self.pending:
+                return
+
+            expected_peer, local_sent, future = self.pending[nonce]
+            if expected_peer != peer or future.done():
+                return
+
+            del self.pending[nonce]
+            future.set_result((local_sent, foreign_received, foreign_sent, local_received))
+
+    async def exchange(self, peers: Iterable[Hashable]) -> dict[Hashable, list[tuple[int, int, int, int]]]:
+        """Send self.samples requests to every peer at once and collect
+            the observations that arrive before the timeout.
+        """
+        loop = asyncio.get_running_loop()
+        waiting = {}
+        nonces = []
+
+        for peer in peers:
+            for _ in range(self.samples):
+                nonce = self._next_nonce()
+                future = loop.create_future()
+                local_sent = self.clock.now()
+                self.pending[nonce] = (peer, local_sent, future)
+                waiting[future] = peer
+                nonces.append(nonce)
+                self.transport.send(
+                    struct.pack(REQUEST_FORMAT, REQUEST, nonce, local_sent),
+                    peer
+                )
+
+        if len(waiting) == 0:
+            return {}
+
+        try:
+            done, _ = await asyncio.wait(set(waiting), timeout=self.timeout)
+        finally:
+            for nonce in nonces:
+                self.pending.pop(nonce, None)
+
+        observations = {}
+        for future in done:
+            observations.setdefault(waiting[future], []).append(future.result())
+
+        return observations
+
+    async def round(self, peers: Iterable[Hashable]) -> tuple[int]:
+        """Run one synchronization round against the peers and return
+            the offsets passed to clock.synchronize.
+        """
+        offsets, errors = calculate_offsets(self.clock, await self.exchange(peers))
+        self.clock.synchronize(offsets, errors)
+        return offsets
+
+
+@dataclass
+class Envelope:
+    """Codec that piggybacks clock-sync timestamps and the packed clock
+        on application payloads. Each envelope echoes the send time of
+        the last message received from the peer along with its receipt
+        time, so every round trip of normal traffic yields an
+        observation for calculate_offset without extra packets. Each
+        side tags its timestamps with a generation that increments on
+        synchronize, so round trips spanning a sync are discarded.
+    """
+    clock: ClockProtocol
+    sync_clock: HybridTimeProtocol = field(default=None)
+    window: int = field(default=10)
+    echoes: dict = field(default_factory=dict)
+    observations: dict = field(default_factory=dict)
+    generation: int = field(default=0)
+
+    def __post_init__(self) -> None:
+        assert isinstance(self.clock, ClockProtocol), \
+            'clock must implement ClockProtocol'
+        if self.sync_clock is None:
+            self.sync_clock = self.clock
+        assert isinstance(self.sync_clock, HybridTimeProtocol), \
+            'sync_clock must implement HybridTimeProtocol'
+        assert type(self.window) is int and self.window > 0, \
+            'window must be int > 0'
+
+    def wrap(self, payload: bytes, peer: Hashable) -> bytes:
+        """Attach the timing data and packed clock to the payload."""
+        assert type(payload) is bytes, 'payload must be bytes'
+
+        foreign_sent, local_received, foreign_generation, generation = \
+            self.echoes.pop(peer, (0, 0, 0, self.generation))
+        if generation != self.generation:
+            foreign_sent, local_received, foreign_generation = 0, 0, 0
+
+        packed = self.clock.pack()
+        return struct.pack(
+            ENVELOPE_FORMAT,
+            self.sync_clock.now(),
+            self.generation,
+            foreign_sent,
+            local_received,
+            foreign_generation,
+            len(packed)
+        ) + packed + payload
+
+    def unwrap(self, data: bytes, peer: Hashable) -> tuple[ClockProtocol, bytes]:
+        """Harvest the timing data from an envelope and return the
+            unpacked foreign clock and the payload.
+        """
+        local_received = self.sync_clock.now()
+        assert type(data) is bytes, 'data must be bytes'
+        assert len(data) >= ENVELOPE_SIZE, f'data must be bytes of len >= {ENVELOPE_SIZE}'
+
+        foreign_sent, foreign_generation, local_sent, foreign_received, \
+            generation, size = struct.unpack(ENVELOPE_FORMAT, data[:ENVELOPE_SIZE])
+        assert len(data) >= ENVELOPE_SIZE + size, 'data is truncated'
+
+        self.echoes[peer] = (foreign_sent, local_received, foreign_generation, self.generation)
+
+        if local_sent != 0 and generation == self.generation:
+            if peer not in self.observations:
+                self.observations[peer] = BoundedQueue(self.window)
+            self.observations[peer].append(
+                (local_sent, foreign_received, foreign_sent, local_received)
+            )
+
+        clock = type(self.clock).unpack(data[ENVELOPE_SIZE:ENVELOPE_SIZE+size])
+        return (clock, data[ENVELOPE_SIZE+size:])
+
+    def synchronize(self) -> tuple[int]:
+        """Feed the harvested observations to sync_clock.synchronize,
+            clear the windows and start a new generation, since all
+            pending timestamps were measured against the old offset.
+            Returns the offsets used.
+        """
+        offsets, errors = calculate_offsets(
+            self.sync_clock,
+            {peer: queue.read() for peer, queue in self.observations.items()}
+        )
+        self.observations = {}
+        self.generation = (self.generation + 1) % 2**16
+        self.sync_clock.synchronize(offsets, errors)
+        return offsets
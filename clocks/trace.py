@@ -0,0 +1,154 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator
+import json
+import struct
+
+
+# binary trace: magic, then records tagged as uuid definitions or timestamps
+MAGIC = b'CLKT\x01'
+DEFINE = 0
+TIMESTAMP = 1
+INT = 0
+VECTOR = 1
+
+
+@dataclass
+class TraceWriter:
+    """Streams clock timestamps to a file as JSON lines or as a compact
+        binary trace. Timestamps are written field by field without
+        building intermediate containers, and the hex (JSON) or numeric
+        id (binary) of each uuid is computed once and cached. The cache
+        is cleared once it holds cache_size uuids; in binary mode ids
+        are then reused and uuids are defined again as they reappear.
+    """
+    file: BinaryIO
+    binary: bool = field(default=False)
+    cache_size: int = field(default=65536)
+    ids: dict = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.binary:
+            self.file.write(MAGIC)
+
+    def _uuid_id(self, uuid: bytes) -> int:
+        """Return the numeric id of the uuid, defining it if necessary."""
+        if uuid not in self.ids:
+            if len(self.ids) >= self.cache_size:
+                self.ids.clear()
+            self.ids[uuid] = len(self.ids)
+            self.file.write(
+                struct.pack('!BIB', DEFINE, self.ids[uuid], len(uuid)) + uuid
+            )
+        return self.ids[uuid]
+
+    def _uuid_hex(self, uuid: bytes) -> str:
+        """Return the hex of the uuid from the cache."""
+        if uuid not in self.ids:
+            if len(self.ids) >= self.cache_size:
+                self.ids.clear()
+            self.ids[uuid] = uuid.hex()
+        return self.ids[uuid]
+
+    def write(self, ts: tuple) -> None:
+        """Write a timestamp as returned by a clock's read method."""
+        assert type(ts) is tuple, 'ts must be tuple'
+        assert type(ts[0]) is bytes, 'ts[0] must be bytes uuid'
+
+        if self.binary:
+            self._write_binary(ts)
+        else:
+            self._write_json(ts)
+
+    def _write_json(self, ts: tuple) -> None:
+        parts = ['{"uuid":"', self._uuid_hex(ts[0]), '","ts":[']
+        for i in range(1, len(ts)):
+            if i > 1:
+                parts.append(',')
+            if type(ts[i]) is tuple:
+                parts.append('[')
+                parts.append(','.join(map(str, ts[i])))
+                parts.append(']')
+            else:
+                parts.append(str(ts[i]))
+        parts.append(']}\n')
+        self.file.write(''.join(parts).encode())
+
+    def _write_binary(self, ts: tuple) -> None:
+        uuid_id = self._uuid_id(ts[0])
+        parts = [struct.pack('!BIB', TIMESTAMP, uuid_id, len(ts) - 1)]
+        for i in range(1, len(ts)):
+            if type(ts[i]) is tuple:
+                parts.append(struct.pack(f'!BI{len(ts[i])}Q', VECTOR, len(ts[i]), *ts[i]))
+            else:
+                parts.append(struct.pack('!BQ', INT, ts[i]))
+        self.file.write(b''.join(parts))
+
+    def flush(self) -> None:
+        """Flush the underlying file."""
+        self.file.flush()
+
+
+def read_trace(file: BinaryIO) -> Iterator[tuple]:
+    """Read a trace written by TraceWriter in either format, yielding
+        timestamps comparable with the clock that produced them.
+    """
+    prefix = file.read(len(MAGIC))
+    if prefix == MAGIC:
+        yield from _read_binary(file)
+    else:
+        yield from _read_json(file, prefix)
+
+
+def _read_exactly(file: BinaryIO, size: int) -> bytes:
+    data = file.read(size)
+    assert len(data) == size, 'trace is truncated'
+    return data
+
+
+def _read_binary(file: BinaryIO) -> Iterator[tuple]:
+    uuids = {}
+    while True:
+        header = file.read(6)
+        if not header:
+            return
+        assert len(header) == 6, 'trace is truncated'
+        tag, uuid_id, size = struct.unpack('!BIB', header)
+
+        if tag == DEFINE:
+            uuids[uuid_id] = _read_exactly(file, size)
+            continue
+
+        assert tag == TIMESTAMP, 'trace has invalid record tag'
+        assert uuid_id in uuids, 'trace has undefined uuid id'
+        ts = [uuids[uuid_id]]
+        for _ in range(size):
+            kind, = struct.unpack('!B', _read_exactly(file, 1))
+            if kind == VECTOR:
+                length, = struct.unpack('!I', _read_exactly(file, 4))
+                ts.append(struct.unpack(f'!{length}Q', _read_exactly(file, 8 * length)))
+            else:
+                ts.append(struct.unpack('!Q', _read_exactly(file, 8))[0])
+        yield tuple(ts)
+
+
+def decode_timestamp(record: dict, uuids: dict) -> tuple:
+    """Convert the uuid and ts fields of a JSON record back into a
+        timestamp, caching decoded uuids by hex in uuids.
+    """
+    if record['uuid'] not in uuids:
+        uuids[record['uuid']] = bytes.fromhex(record['uuid'])
+
+    return (
+        uuids[record['uuid']],
+        *(tuple(v) if type(v) is list else v for v in record['ts'])
+    )
+
+
+def _read_json(file: BinaryIO, prefix: bytes) -> Iterator[tuple]:
+    uuids = {}
+    line = prefix + file.readline()
+    while line:
+        if line.strip():
+            yield decode_timestamp(json.loads(line), uuids)
+        line = file.readline()
@@ -1,11 +1,10 @@
 from __future__ import annotations
 import struct
-from clocks.misc import bytes_are_same
 from dataclasses import dataclass, field
 from uuid import uuid1
 
 
-@dataclass
+@dataclass(slots=True)
 class VectorClock:
     uuid: bytes = field(default_factory=lambda: uuid1().bytes)
     index: int = field(default=0)
@@ -22,6 +21,20 @@ class VectorClock:
 
         return cls(uuid, index, vector)
 
+    @classmethod
+    def setup_many(cls, count: int, options: dict = {}) -> list[VectorClock]:
+        """Set up count new instances sharing one uuid, with instance i
+            advancing index i of the vector.
+        """
+        assert type(count) is int and count >= 0, 'count must be int >= 0'
+        assert type(options) is dict, 'options must be dict'
+
+        uuid = options['uuid'] if 'uuid' in options else uuid1().bytes
+        vector = options['vector'] if 'vector' in options else (0,) * count
+        assert len(vector) >= count, 'vector must have len >= count'
+
+        return [cls(uuid, index, vector) for index in range(count)]
+
     def advance(self, data: tuple = None) -> tuple[bytes, tuple[int]]:
         """Create an update that advances the clock to the given time."""
         if data is not None:
@@ -48,7 +61,7 @@ class VectorClock:
         for s in state[1]:
             assert type(s) is int, 'state must be tuple[bytes, tuple[int]]'
 
-        if not bytes_are_same(state[0], self.uuid):
+        if state[0] != self.uuid:
             return self
 
         vector = [*self.vector]
@@ -71,7 +84,7 @@ class VectorClock:
         assert type(ts1[1]) is type(ts2[1]) is tuple, \
             'ts1 and ts2 must be tuple[bytes, tuple[int]]'
 
-        return len(ts1[1]) != len(ts2[1]) or not bytes_are_same(ts1[0], ts2[0])
+        return len(ts1[1]) != len(ts2[1]) or ts1[0] != ts2[0]
 
     @staticmethod
     def happens_before(ts1: tuple[bytes, tuple[int]], ts2: tuple[bytes, tuple[int]]) -> bool:
@@ -2,7 +2,7 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from clocks import interfaces, misc
+from clocks import interfaces, misc, sync, durable, simulate, trace, hybrid, checker
 from clocks.scalar import ScalarClock
 from clocks.vector import VectorClock, MapClock
 from clocks.chain import DynamicChainClock, AntichainChainClock, VariableChainClock
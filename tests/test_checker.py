@@ -0,0 +1,135 @@
+from context import checker, VectorClock
+from io import BytesIO
+import json
+import unittest
+
+
+class TestCausalChecker(unittest.TestCase):
+    """Test suite for classes."""
+    def setUp(self):
+        self.p0, self.p1 = VectorClock.setup_many(2)
+
+    def event(self, clock: VectorClock, received: tuple = None) -> tuple:
+        """Tick the clock, merging a received timestamp if given."""
+        clock.update(received or clock.read())
+        return clock.read()
+
+    def test_imports_without_error(self):
+        pass
+
+    def test_CausalChecker_accepts_causally_consistent_history(self):
+        w1 = self.event(self.p0)
+        w2 = self.event(self.p0)
+        r1 = self.event(self.p1)
+        r2 = self.event(self.p1, w2)
+        history = [
+            ('r', 'x', None, r1),
+            ('w', 'x', 1, w1),
+            ('w', 'x', 2, w2),
+            ('r', 'x', 2, r2),
+        ]
+        assert list(checker.CausalChecker().check(history)) == []
+
+    def test_CausalChecker_accepts_reads_of_concurrent_writes(self):
+        w1 = self.event(self.p0)
+        w2 = self.event(self.p1)
+        r = self.event(self.p0)
+        history = [('w', 'x', 1, w1), ('w', 'x', 2, w2), ('r', 'x', 2, r), ('r', 'x', 1, r)]
+        assert list(checker.CausalChecker().check(history)) == []
+
+    def test_CausalChecker_reports_read_of_overwritten_value(self):
+        w1 = self.event(self.p0)
+        w2 = self.event(self.p0)
+        r = self.event(self.p1, w2)
+        history = [('w', 'x', 1, w1), ('w', 'x', 2, w2), ('r', 'x', 1, r), ('r', 'x', None, r)]
+        violations = list(checker.CausalChecker().check(history))
+        assert [v.kind for v in violations] == [checker.STALE_READ] * 2
+        assert violations[0].index == 2
+        assert violations[0].write == w2
+
+    def test_CausalChecker_reports_causal_inversion(self):
+        r = self.event(self.p1)
+        w = self.event(self.p0, r)
+        history = [('w', 'x', 1, w), ('r', 'x', 1, r)]
+        violations = list(checker.CausalChecker().check(history))
+        assert len(violations) == 1
+        assert violations[0].kind == checker.CAUSAL_INVERSION
+        assert violations[0].write == w
+
+    def test_CausalChecker_reports_read_of_unwritten_value(self):
+        r = self.event(self.p1)
+        violations = list(checker.CausalChecker().check([('r', 'x', 7, r)]))
+        assert [v.kind for v in violations] == [checker.UNWRITTEN_VALUE]
+
+    def test_CausalChecker_frontier_holds_only_maximal_writes(self):
+        c = checker.CausalChecker()
+        c.write('x', 1, self.event(self.p0))
+        c.write('x', 2, self.event(self.p0))
+        assert list(c.keys['x'].frontier) == [2]
+        c.write('x', 3, self.event(self.p1))
+        assert list(c.keys['x'].frontier) == [2, 3]
+
+    def test_CausalChecker_memory_is_bounded_by_window(self):
+        c = checker.CausalChecker(window=4)
+        first = self.event(self.p0)
+        history = [('w', 'x', 0, first)]
+        history.extend(('w', 'x', i, self.event(self.p0)) for i in range(1, 100))
+        history.append(('r', 'x', 0, self.event(self.p1, first)))
+        assert list(c.check(history)) == []
+        assert len(c.keys['x'].writes) == 4
+        assert c.unverified == 1
+        assert c.operations == 101
+
+    def test_CausalChecker_initial_reads_after_eviction_are_unverified(self):
+        c = checker.CausalChecker(window=2)
+        history = [('w', 'x', 'a', self.event(self.p0))]
+        history.extend(('w', 'x', i, self.event(self.p0)) for i in range(3))
+        history.append(('r', 'x', None, self.event(self.p1, history[0][3])))
+        history.append(('r', 'y', None, self.event(self.p1)))
+        assert list(c.check(history)) == []
+        assert c.unverified == 1
+
+    def test_CausalChecker_total_memory_is_bounded_by_budget(self):
+        c = checker.CausalChecker(budget=50)
+        history = [('w', k, 0, self.event(self.p0)) for k in range(1000)]
+        history.append(('r', 0, 0, self.event(self.p1, history[0][3])))
+        history.append(('r', 999, 0, self.event(self.p1, history[999][3])))
+        assert list(c.check(history)) == []
+        assert c.retained <= 50
+        assert len(c.keys) <= 50
+        assert 0 not in c.keys and 999 in c.keys
+        assert c.unverified == 1, 'reads of dropped keys are unverified'
+
+    def test_CausalChecker_reads_of_writes_before_a_drop_are_unverified(self):
+        c = checker.CausalChecker(budget=3)
+        old = self.event(self.p0)
+        history = [('w', 'x', 'old', old)]
+        history.extend(('w', k, 0, self.event(self.p0)) for k in range(5))
+        history.append(('w', 'x', 'new', self.event(self.p0)))
+        history.append(('r', 'x', 'old', self.event(self.p1, old)))
+        assert list(c.check(history)) == []
+        assert c.unverified == 1
+
+    def test_CausalChecker_frontier_is_bounded_by_window(self):
+        c = checker.CausalChecker(window=3)
+        clocks = VectorClock.setup_many(10)
+        for i, clock in enumerate(clocks):
+            c.write('x', i, self.event(clock))
+        assert len(c.keys['x'].frontier) == 3
+        assert c.retained == 6
+
+    def test_read_history_streams_json_lines(self):
+        w = self.event(self.p0)
+        r = self.event(self.p1, w)
+        lines = [
+            {'op': 'w', 'key': 'x', 'value': [1, 2], 'uuid': w[0].hex(), 'ts': [list(w[1])]},
+            {'op': 'r', 'key': 'x', 'value': [1, 2], 'uuid': r[0].hex(), 'ts': [list(r[1])]},
+        ]
+        file = BytesIO(b''.join(json.dumps(l).encode() + b'\n' for l in lines))
+        history = list(checker.read_history(file))
+        assert history == [('w', 'x', (1, 2), w), ('r', 'x', (1, 2), r)]
+        assert list(checker.CausalChecker().check(history)) == []
+
+
+if __name__ == '__main__':
+    unittest.main()
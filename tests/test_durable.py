@@ -0,0 +1,98 @@
+from context import durable, ScalarClock, VectorClock
+import os
+import tempfile
+import unittest
+
+
+class TestDurableClock(unittest.TestCase):
+    """Test suite for classes."""
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'clock.state')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_imports_without_error(self):
+        pass
+
+    def test_DurableClock_open_creates_state_file_and_reserves_window(self):
+        with durable.DurableClock.open(self.path, ScalarClock(), window=10) as clock:
+            assert os.path.exists(self.path)
+            assert clock.reserved == 10
+            assert clock.sequence == 1
+
+    def test_DurableClock_only_rewrites_when_crossing_reservation(self):
+        with durable.DurableClock.open(self.path, ScalarClock(), window=100) as clock:
+            for _ in range(250):
+                clock.update(clock.read())
+            assert clock.read()[1] == 250
+            assert clock.sequence == 3, 'one write per reservation window'
+
+    def test_DurableClock_restart_is_monotonic(self):
+        clock = durable.DurableClock.open(self.path, ScalarClock(), window=10)
+        uuid = clock.clock.uuid
+        for _ in range(15):
+            clock.update(clock.read())
+        last = clock.read()
+        clock.close()
+
+        with durable.DurableClock.open(self.path, ScalarClock(), window=10) as clock:
+            assert clock.clock.uuid == uuid, 'uuid must be restored'
+            assert ScalarClock.happens_before(last, clock.read())
+            clock.update(clock.read())
+            assert ScalarClock.happens_before(last, clock.read())
+
+    def test_DurableClock_restores_VectorClock_own_component(self):
+        vclock = VectorClock(vector=(0, 0, 0), index=1)
+        clock = durable.DurableClock.open(self.path, vclock, window=5)
+        clock.update((vclock.uuid, (3, 7, 7)))
+        assert clock.read()[1] == (3, 8, 7)
+        clock.close()
+
+        with durable.DurableClock.open(self.path, VectorClock(vector=(0, 0, 0))) as clock:
+            assert clock.clock.index == 1
+            assert clock.read()[1] == (3, 13, 7), \
+                'own component resumes from the reserved mark'
+
+    def test_DurableClock_open_rejects_mismatched_or_truncated_files(self):
+        durable.DurableClock.open(self.path, ScalarClock()).close()
+        with self.assertRaises(AssertionError) as e:
+            durable.DurableClock.open(self.path, VectorClock(vector=(0, 0, 0)))
+        assert str(e.exception) == 'state file does not match clock size'
+
+        with open(self.path, 'r+b') as f:
+            f.truncate(durable.HEADER_SIZE + 4)
+        with self.assertRaises(AssertionError) as e:
+            durable.DurableClock.open(self.path, ScalarClock())
+        assert str(e.exception) == 'state file is truncated'
+
+        with open(self.path, 'r+b') as f:
+            f.truncate(3)
+        with self.assertRaises(AssertionError) as e:
+            durable.DurableClock.open(self.path, ScalarClock())
+        assert str(e.exception) == 'state file is truncated'
+
+    def test_DurableClock_rolls_back_update_when_reservation_fails(self):
+        with durable.DurableClock.open(self.path, ScalarClock(), window=10) as clock:
+            clock.update(clock.read())
+            with self.assertRaises(AssertionError):
+                clock.update((clock.clock.uuid, 2**32 - 5))
+            assert clock.read()[1] == 1
+            assert clock.reserved == 10 and clock.sequence == 1
+
+    def test_DurableClock_falls_back_to_previous_slot_when_torn(self):
+        clock = durable.DurableClock.open(self.path, ScalarClock(), window=10)
+        clock.update((clock.clock.uuid, 20))
+        sequence = clock.sequence
+        offset = clock._slot_offset(sequence)
+        clock.mm[offset+durable.SLOT_SIZE] ^= 0xff
+        clock.close()
+
+        with durable.DurableClock.open(self.path, ScalarClock(), window=10) as clock:
+            assert clock.sequence == sequence, 'torn slot is rewritten first'
+            assert clock.read()[1] == 10
+
+
+if __name__ == '__main__':
+    unittest.main()
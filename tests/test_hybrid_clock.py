@@ -0,0 +1,179 @@
+from time import perf_counter, time, time_ns
+import asyncio
+import struct
+from context import interfaces, hybrid, HybridClock
+import unittest
+
+
+class TestHybridClock(unittest.TestCase):
+    """Test suite for classes."""
+    def test_imports_without_error(self):
+        pass
+
+    def test_HybridClock_implements_ClockProtocol_and_HybridTimeProtocol(self):
+        assert issubclass(HybridClock, interfaces.ClockProtocol), \
+            'HybridClock must implement ClockProtocol'
+        assert issubclass(HybridClock, interfaces.HybridTimeProtocol), \
+            'HybridClock must implement HybridTimeProtocol'
+
+    def test_HybridClock_setup_accepts_uuid_ts_scalar_and_offset_in_options(self):
+        clock = HybridClock.setup({'uuid': b'123', 'ts': 5, 'scalar': 3, 'offset': -2})
+        assert isinstance(clock, HybridClock), 'HybridClock.setup must return instance'
+        assert clock.uuid == b'123', 'uuid must match that specified in setup'
+        assert clock.ts == 5, 'ts must match that specified in setup'
+        assert clock.scalar == 3, 'scalar must match that specified in setup'
+        assert clock.offset == -2, 'offset must match that specified in setup'
+
+    def test_HybridClock_now_includes_offset(self):
+        clock = HybridClock(offset=100_000_000)
+        assert abs(clock.now() - time_ns() // 1000 - 100_000_000) <= 10_000
+
+    def test_HybridClock_update_uses_physical_time_when_ahead(self):
+        clock = HybridClock()
+        clock.update(clock.advance())
+        uuid, ts, scalar = clock.read()
+        assert abs(ts - time_ns() // 1000) <= 10_000
+        assert scalar in (0, 1)
+
+    def test_HybridClock_update_follows_received_time_when_ahead(self):
+        clock = HybridClock()
+        future = time_ns() // 1000 + 1_000_000_000
+        clock.update((clock.uuid, future, 7))
+        assert clock.read()[1:] == (future, 8)
+        clock.update((clock.uuid, future, 2))
+        assert clock.read()[1:] == (future, 9)
+
+    def test_HybridClock_update_unaffected_by_mismatched_uuid(self):
+        clock = HybridClock()
+        ts0 = clock.read()
+        clock.update((b'not the uuid', time_ns() // 1000 + 1_000_000_000, 0))
+        assert clock.read() == ts0, 'timestamps should be the same'
+
+    def test_HybridClock_happens_before_and_are_concurrent_functions(self):
+        clock = HybridClock()
+        ts0 = clock.read()
+        clock.update(clock.advance())
+        ts1 = clock.read()
+        assert HybridClock.happens_before(ts0, ts1)
+        assert not HybridClock.happens_before(ts1, ts0)
+        assert HybridClock.are_concurrent(ts1, clock.read())
+        assert HybridClock.are_incomparable(ts1, HybridClock().read())
+        assert not HybridClock.happens_before(ts0, HybridClock().read())
+
+    def test_HybridClock_calculate_offset_uses_lowest_delay_observation(self):
+        observations = [
+            (100, 112, 113, 103),
+            (200, 230, 231, 210),
+        ]
+        assert HybridClock.calculate_offset(observations) == (11, 1)
+
+    def test_HybridClock_synchronize_moves_offset_to_median(self):
+        clock = HybridClock()
+        clock.synchronize((10, 20, 30, 40))
+        assert clock.offset == 20
+        clock.synchronize(())
+        assert clock.offset == 20
+
+    def test_HybridClock_pack_and_unpack_round_trip(self):
+        clock = HybridClock()
+        clock.update(clock.advance())
+        packed = clock.pack()
+        assert packed == struct.pack('!16sQI', clock.uuid, clock.ts, clock.scalar)
+        unpacked = HybridClock.unpack(packed)
+        assert isinstance(unpacked, HybridClock)
+        assert unpacked.read() == clock.read()
+
+    def test_HybridClock_read_interval_brackets_now_by_error(self):
+        clock = HybridClock.setup({'offset': 5, 'error': 3, 'max_drift': 0})
+        earliest, latest = clock.read_interval()
+        assert latest - earliest == 6
+        assert abs((earliest + 3) - clock.now()) <= 10_000
+
+    def test_HybridClock_error_bound_widens_with_time_since_sync(self):
+        clock = HybridClock(error=3, max_drift=500)
+        clock.synced -= 2_000_000
+        assert clock.error_bound() >= 3 + 1_000
+        earliest, latest = clock.read_interval()
+        assert latest - earliest >= 2 * (3 + 1_000)
+
+        clock.synchronize((0,), (3,))
+        assert clock.error_bound() < 3 + 1_000, 'synchronize resets the drift'
+
+    def test_HybridClock_commit_wait_waits_out_the_drift(self):
+        clock = HybridClock(max_drift=100_000)
+        clock.synced -= 1_000_000
+        ts = (clock.uuid, clock.read_interval()[1], 0)
+
+        start = perf_counter()
+        asyncio.run(clock.commit_wait(ts))
+        assert clock.read_interval()[0] > ts[1]
+        assert perf_counter() - start >= 0.2
+
+    def test_HybridClock_commit_wait_returns_immediately_for_past_ts(self):
+        clock = HybridClock(error=2_000)
+        ts = (clock.uuid, clock.now() - 3_000, 0)
+
+        start = perf_counter()
+        asyncio.run(clock.commit_wait(ts))
+        assert perf_counter() - start < 0.1
+
+    def test_HybridClock_commit_wait_waits_out_the_error_bound(self):
+        clock = HybridClock(error=50_000)
+        clock.update(clock.advance())
+        ts = clock.read()
+
+        async def run():
+            await asyncio.gather(*[clock.commit_wait(ts) for _ in range(1000)])
+
+        start = perf_counter()
+        asyncio.run(run())
+        elapsed = perf_counter() - start
+        assert clock.read_interval()[0] > ts[1]
+        assert 0.04 <= elapsed < 0.2, 'wait must track the bound, not whole seconds'
+        assert clock.waiter.heap == []
+
+    def test_HybridClock_synchronize_sets_error_from_delay_and_spread(self):
+        clock = HybridClock()
+        clock.synchronize((10, 20, 30, 40), (1, 2, 3, 4))
+        assert clock.offset == 20
+        assert clock.error == 2 + 10
+        clock.synchronize((0,))
+        assert clock.error == 12, 'error is kept when no estimates are given'
+
+    def test_CommitWaiter_coalesces_waits_onto_one_timer(self):
+        waiter = hybrid.CommitWaiter()
+
+        async def run():
+            start = time()
+            first = waiter.wait_until(start + 0.2)
+            timer = waiter.timer
+            later = [waiter.wait_until(start + 0.2 + i / 10_000) for i in range(1000)]
+            assert waiter.timer is timer, 'later deadlines must not reschedule'
+            earlier = waiter.wait_until(time() + 0.01)
+            assert waiter.timer is not timer, 'earlier deadlines must reschedule'
+            await asyncio.gather(first, earlier, *later)
+            return time() - start
+
+        elapsed = asyncio.run(run())
+        assert 0.2 <= elapsed < 1.0
+        assert waiter.heap == [] and waiter.timer is None
+
+    def test_CommitWaiter_refuses_another_loop_while_waits_are_pending(self):
+        waiter = hybrid.CommitWaiter()
+        first = asyncio.new_event_loop()
+
+        async def wait(delay: float):
+            return waiter.wait_until(time() + delay)
+
+        pending = first.run_until_complete(wait(10))
+        with self.assertRaises(AssertionError):
+            asyncio.run(wait(0))
+        assert not pending.done() and len(waiter.heap) == 1
+
+        first.close()
+        asyncio.run(wait(0))
+        assert waiter.heap == []
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -37,6 +37,22 @@ class TestScalarClock(unittest.TestCase):
         assert clock.uuid == b'321', 'uuid must match that specified in setup'
         assert clock.scalar == 99, 'scalar must match that specified in setup'
 
+    def test_ScalarClock_instances_are_slotted(self):
+        assert not hasattr(ScalarClock(), '__dict__'), \
+            'ScalarClock instances must not have a __dict__'
+
+    def test_ScalarClock_setup_many_returns_instances_sharing_uuid(self):
+        clocks = ScalarClock.setup_many(100)
+        assert len(clocks) == 100
+        assert all(isinstance(c, ScalarClock) for c in clocks)
+        assert all(c.uuid is clocks[0].uuid for c in clocks)
+        assert all(c.scalar == 0 for c in clocks)
+
+        clocks = ScalarClock.setup_many(3, {'uuid': b'123', 'scalar': 5})
+        assert [c.read() for c in clocks] == [(b'123', 5)] * 3
+        clocks[0].update(clocks[1].advance())
+        assert clocks[0].scalar == 7 and clocks[1].scalar == 5
+
     def test_ScalarClock_advance_returns_update_with_tuple_int_bytes_form(self):
         clock = ScalarClock()
         update = clock.advance()
@@ -0,0 +1,74 @@
+from random import Random
+from context import simulate, ScalarClock, VectorClock
+import unittest
+
+
+class TestSimulation(unittest.TestCase):
+    """Test suite for classes."""
+    def test_imports_without_error(self):
+        pass
+
+    def test_topologies_never_send_to_self(self):
+        rng = Random(1)
+        for topology in (simulate.ring, simulate.uniform_random, simulate.star):
+            for src in range(10):
+                dst = topology(src, 10, rng)
+                assert 0 <= dst < 10 and dst != src
+
+    def test_Simulation_clocks_share_uuid_and_are_unchanged_types(self):
+        sim = simulate.Simulation(ScalarClock, 10, seed=1)
+        assert all(type(c) is ScalarClock for c in sim.clocks)
+        assert len({c.uuid for c in sim.clocks}) == 1
+
+    def test_Simulation_run_reports_traffic_and_advances_clocks(self):
+        sim = simulate.Simulation(ScalarClock, 50, topology=simulate.ring, seed=2)
+        report = sim.run(duration=10.0)
+        summary = report.summary()
+        assert report.duration == 10.0
+        assert summary['sent'] > 0
+        assert summary['received'] > 0
+        assert summary['bytes_sent'] == summary['sent'] * 20
+        assert summary['dropped'] == 0
+        assert report.throughput(1) == report.received[1] / 10.0
+        assert max(c.scalar for c in sim.clocks) > 1
+
+    def test_Simulation_reports_each_run_separately(self):
+        sim = simulate.Simulation(ScalarClock, 50, seed=6)
+        first = sim.run(duration=10.0)
+        received = list(first.received)
+        second = sim.run(duration=10.0)
+
+        assert list(first.received) == received, 'reports must not change after a run'
+        assert second.duration == 10.0
+        assert sum(first.received) + sum(second.received) == sum(sim.received)
+        assert 0 < sum(second.received) < sum(sim.received)
+        assert second.throughput(1) == second.received[1] / 10.0
+
+    def test_Simulation_runs_VectorClock_with_per_node_options(self):
+        nodes = 8
+        sim = simulate.Simulation(
+            VectorClock, nodes,
+            latency=simulate.uniform(0.0, 0.5),
+            options=lambda i: {'index': i, 'vector': (0,) * nodes},
+            seed=3
+        )
+        report = sim.run(events=2000)
+        assert report.events == 2000
+        assert report.summary()['bytes_per_message'] == 20 + 4 * nodes
+        assert all(len(c.vector) == nodes for c in sim.clocks)
+
+    def test_Simulation_churn_drops_messages_and_restarts_nodes(self):
+        sim = simulate.Simulation(ScalarClock, 20, churn=0.2, seed=4)
+        summary = sim.run(duration=50.0).summary()
+        assert summary['restarts'] > 0
+        assert summary['dropped'] > 0
+
+    def test_Simulation_handles_100k_nodes(self):
+        sim = simulate.Simulation(ScalarClock, 100_000, seed=5)
+        report = sim.run(events=100_000)
+        assert report.events == 100_000
+        assert len(report.received) == 100_000
+
+
+if __name__ == '__main__':
+    unittest.main()
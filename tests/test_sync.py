@@ -0,0 +1,182 @@
+from time import perf_counter
+from context import interfaces, sync, HybridClock, ScalarClock
+import asyncio
+import unittest
+
+
+class DelayedTransport:
+    """In-memory transport that delivers each packet after a delay."""
+    def __init__(self, network: dict, address: int, delay: float) -> None:
+        self.network = network
+        self.address = address
+        self.delay = delay
+        self.handlers = []
+        network[address] = self
+
+    def send(self, data: bytes, peer: int) -> None:
+        loop = asyncio.get_running_loop()
+        for handler in self.network[peer].handlers:
+            loop.call_later(self.delay, handler, data, self.address)
+
+    def listen(self, handler) -> None:
+        self.handlers.append(handler)
+
+    def close(self) -> None:
+        del self.network[self.address]
+
+
+class TestSync(unittest.TestCase):
+    """Test suite for classes."""
+    def test_imports_without_error(self):
+        pass
+
+    def test_UDPTransport_implements_TransportProtocol(self):
+        assert issubclass(sync.UDPTransport, interfaces.TransportProtocol)
+
+    def test_calculate_offsets_returns_one_offset_per_peer(self):
+        clock = HybridClock()
+        offsets = sync.calculate_offsets(clock, {
+            'a': [(100, 112, 113, 103)],
+            'b': [(100, 90, 91, 101)],
+            'c': [],
+        })
+        assert offsets == ((11, -10), (1, 0))
+
+    def test_SyncDriver_round_synchronizes_over_udp_loopback(self):
+        async def run():
+            skews = (0, 10_000_000, 20_000_000, 30_000_000, 40_000_000)
+            transports = [await sync.UDPTransport.open() for _ in skews]
+            drivers = [
+                sync.SyncDriver(HybridClock(offset=skew), transport)
+                for skew, transport in zip(skews, transports)
+            ]
+            try:
+                offsets = await drivers[0].round([t.address for t in transports[1:]])
+            finally:
+                for transport in transports:
+                    transport.close()
+            return drivers[0], offsets
+
+        driver, offsets = asyncio.run(run())
+        assert len(offsets) == 4, 'every peer must contribute an offset'
+        for offset, skew in zip(sorted(offsets), (10, 20, 30, 40)):
+            assert abs(offset - skew * 1_000_000) <= 50_000
+        assert abs(driver.clock.offset - 20_000_000) <= 50_000
+        assert 0 < driver.clock.error <= 10_050_000, \
+            'error must come from the round-trip delay and offset spread'
+        assert driver.pending == {}, 'pending exchanges must be cleared'
+
+    def test_SyncDriver_round_takes_one_round_trip_for_many_peers(self):
+        async def run():
+            network = {}
+            drivers = [
+                sync.SyncDriver(HybridClock(), DelayedTransport(network, i, 0.05), samples=2)
+                for i in range(100)
+            ]
+            start = perf_counter()
+            observations = await drivers[0].exchange(range(1, 100))
+            return observations, perf_counter() - start
+
+        observations, elapsed = asyncio.run(run())
+        assert len(observations) == 99
+        assert all(len(o) == 2 for o in observations.values())
+        assert elapsed < 0.5, 'exchanges must be pipelined, not sequential'
+
+    def test_SyncDriver_exchange_drops_peers_that_time_out(self):
+        async def run():
+            network = {}
+            driver = sync.SyncDriver(
+                HybridClock(), DelayedTransport(network, 0, 0.0), timeout=0.05
+            )
+            DelayedTransport(network, 1, 0.0)
+            observations = await driver.exchange([1])
+            return driver, observations
+
+        driver, observations = asyncio.run(run())
+        assert observations == {}
+        assert driver.pending == {}
+
+    def test_SyncDriver_exchange_cleans_up_when_cancelled(self):
+        async def run():
+            network = {}
+            driver = sync.SyncDriver(HybridClock(), DelayedTransport(network, 0, 0.0))
+            DelayedTransport(network, 1, 0.0)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(driver.exchange([1]), 0.05)
+            return driver
+
+        driver = asyncio.run(run())
+        assert driver.pending == {}
+
+    def test_Envelope_wrap_and_unwrap_round_trip_clock_and_payload(self):
+        clock = ScalarClock()
+        sender = sync.Envelope(clock, HybridClock())
+        receiver = sync.Envelope(ScalarClock(uuid=clock.uuid), HybridClock())
+        clock.update(clock.advance())
+        foreign, payload = receiver.unwrap(sender.wrap(b'hello', 'b'), 'a')
+        assert isinstance(foreign, ScalarClock)
+        assert foreign.read() == clock.read()
+        assert payload == b'hello'
+
+    def test_Envelope_harvests_observations_from_normal_traffic(self):
+        a = sync.Envelope(HybridClock())
+        b = sync.Envelope(HybridClock(offset=30_000_000))
+        c = sync.Envelope(HybridClock(offset=40_000_000))
+
+        assert a.observations == {}, 'first message cannot yield an observation'
+        for _ in range(3):
+            for peer, name in ((b, 'b'), (c, 'c')):
+                peer.unwrap(a.wrap(b'ping', name), 'a')
+                a.unwrap(peer.wrap(b'pong', 'a'), name)
+
+        assert len(a.observations['b'].read()) == 3
+        assert len(a.observations['c'].read()) == 3
+        for observation in a.observations['b'].read():
+            assert len(observation) == 4
+
+        offsets = a.synchronize()
+        assert len(offsets) == 2
+        assert abs(a.clock.offset - 30_000_000) <= 10_000
+        assert a.observations == {}, 'windows must be cleared after synchronizing'
+
+    def test_Envelope_discards_round_trips_spanning_a_sync(self):
+        a = sync.Envelope(HybridClock())
+        b = sync.Envelope(HybridClock(offset=30_000_000))
+        c = sync.Envelope(HybridClock(offset=30_000_000))
+        for peer, name in ((b, 'b'), (c, 'c')):
+            peer.unwrap(a.wrap(b'ping', name), 'a')
+            a.unwrap(peer.wrap(b'pong', 'a'), name)
+
+        # a's offset moves while its next message to b is in flight
+        in_flight = a.wrap(b'ping', 'b')
+        a.synchronize()
+        offset = a.clock.offset
+        assert abs(offset - 30_000_000) <= 10_000
+
+        b.unwrap(in_flight, 'a')
+        a.unwrap(b.wrap(b'pong', 'a'), 'b')
+        assert a.observations == {}, 'stale observation must be dropped'
+        assert a.synchronize() == ()
+        assert a.clock.offset == offset
+
+        # b syncing between receiving and replying also spoils the echo
+        b.unwrap(a.wrap(b'ping', 'b'), 'a')
+        b.synchronize()
+        a.unwrap(b.wrap(b'pong', 'a'), 'b')
+        assert a.observations == {}
+
+        b.unwrap(a.wrap(b'ping', 'b'), 'a')
+        a.unwrap(b.wrap(b'pong', 'a'), 'b')
+        assert len(a.observations['b'].read()) == 1
+
+    def test_Envelope_observation_window_is_bounded(self):
+        a = sync.Envelope(HybridClock(), window=2)
+        b = sync.Envelope(HybridClock())
+        for _ in range(5):
+            b.unwrap(a.wrap(b'', 'b'), 'a')
+            a.unwrap(b.wrap(b'', 'a'), 'b')
+        assert len(a.observations['b'].read()) == 2
+
+
+if __name__ == '__main__':
+    unittest.main()
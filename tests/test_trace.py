@@ -0,0 +1,93 @@
+from context import trace, ScalarClock, VectorClock, HybridClock
+from io import BytesIO
+import json
+import unittest
+
+
+class TestTrace(unittest.TestCase):
+    """Test suite for classes."""
+    def timestamps(self) -> list[tuple]:
+        scalar = ScalarClock()
+        vector = VectorClock(vector=(0, 0, 0), index=2)
+        hybrid = HybridClock()
+        result = []
+        for _ in range(3):
+            scalar.update(scalar.advance())
+            vector.update(vector.advance())
+            hybrid.update(hybrid.advance())
+            result.extend([scalar.read(), vector.read(), hybrid.read()])
+        return result
+
+    def test_imports_without_error(self):
+        pass
+
+    def test_TraceWriter_writes_json_lines(self):
+        clock = VectorClock(vector=(1, 2, 3))
+        file = BytesIO()
+        trace.TraceWriter(file).write(clock.read())
+        record = json.loads(file.getvalue())
+        assert record == {'uuid': clock.uuid.hex(), 'ts': [[1, 2, 3]]}
+
+    def test_TraceWriter_caches_uuid_hex(self):
+        clock = ScalarClock()
+        writer = trace.TraceWriter(BytesIO())
+        writer.write(clock.read())
+        cached = writer.ids[clock.uuid]
+        writer.write(clock.read())
+        assert writer.ids[clock.uuid] is cached
+        assert len(writer.ids) == 1
+
+    def test_TraceWriter_binary_defines_each_uuid_once(self):
+        clock = ScalarClock()
+        file = BytesIO()
+        writer = trace.TraceWriter(file, binary=True)
+        for _ in range(10):
+            writer.write(clock.read())
+        assert file.getvalue().startswith(trace.MAGIC)
+        assert file.getvalue().count(clock.uuid) == 1
+        assert len(file.getvalue()) < 10 * len(json.dumps(
+            {'uuid': clock.uuid.hex(), 'ts': [0]}
+        ))
+
+    def test_TraceWriter_binary_ids_are_bounded_by_cache_size(self):
+        timestamps = [ScalarClock().read() for _ in range(5)] * 2
+        file = BytesIO()
+        writer = trace.TraceWriter(file, binary=True, cache_size=2)
+        for ts in timestamps:
+            writer.write(ts)
+        assert len(writer.ids) <= 2
+        file.seek(0)
+        assert list(trace.read_trace(file)) == timestamps
+
+    def test_read_trace_rejects_undefined_uuid_id(self):
+        file = BytesIO(trace.MAGIC + bytes([trace.TIMESTAMP, 0, 0, 0, 7, 0]))
+        with self.assertRaises(AssertionError) as e:
+            list(trace.read_trace(file))
+        assert str(e.exception) == 'trace has undefined uuid id'
+
+    def test_read_trace_round_trips_both_formats(self):
+        timestamps = self.timestamps()
+        for binary in (False, True):
+            file = BytesIO()
+            writer = trace.TraceWriter(file, binary=binary)
+            for ts in timestamps:
+                writer.write(ts)
+            file.seek(0)
+            assert list(trace.read_trace(file)) == timestamps
+
+    def test_read_trace_timestamps_are_comparable(self):
+        clock = ScalarClock()
+        file = BytesIO()
+        writer = trace.TraceWriter(file, binary=True)
+        writer.write(clock.read())
+        clock.update(clock.advance())
+        writer.write(clock.read())
+        file.seek(0)
+        ts0, ts1 = trace.read_trace(file)
+        assert ts0[0] == clock.uuid
+        assert ts0[0] is ts1[0], 'decoded uuids must be shared'
+        assert ScalarClock.happens_before(ts0, ts1)
+
+
+if __name__ == '__main__':
+    unittest.main()
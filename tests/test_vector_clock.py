@@ -39,6 +39,20 @@ class TestVectorClock(unittest.TestCase):
         assert clock.uuid == b'321', 'uuid must match that specified in setup'
         assert clock.vector == (99,), 'vector must match that specified in setup'
 
+    def test_VectorClock_instances_are_slotted(self):
+        assert not hasattr(VectorClock(), '__dict__'), \
+            'VectorClock instances must not have a __dict__'
+
+    def test_VectorClock_setup_many_returns_instances_with_distinct_indices(self):
+        clocks = VectorClock.setup_many(5)
+        assert len(clocks) == 5
+        assert all(c.uuid is clocks[0].uuid for c in clocks)
+        assert [c.index for c in clocks] == [0, 1, 2, 3, 4]
+        assert all(c.vector == (0,) * 5 for c in clocks)
+
+        clocks[0].update(clocks[3].advance())
+        assert clocks[0].vector == (1, 0, 0, 1, 0)
+
     def test_VectorClock_advance_returns_update_with_tuple_bytes_tuple_int_form(self):
         clock = VectorClock()
         update = clock.advance()